@@ -0,0 +1,11 @@
+"""
+This package provides a soak-test harness for the TeamSpeak AFK Bot.
+
+It runs the bot's main loop against a simulated ServerQuery endpoint with churning clients at
+accelerated time, and checks that memory usage and sweep latency stay flat. Run it with
+``python -m soak``.
+"""
+
+from .harness import SoakBudget, SoakReport, check_budget, run_soak
+
+__all__ = ["SoakBudget", "SoakReport", "check_budget", "run_soak"]
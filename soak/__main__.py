@@ -0,0 +1,146 @@
+"""
+Command-line entry point for the soak-test harness.
+
+Runs the bot against a simulated server, prints the samples and the top growing allocators, and
+exits with status 1 if the run exceeded its budget.
+"""
+
+import argparse
+import logging
+import sys
+
+from .harness import SoakBudget, run_soak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TeamSpeak AFK Bot soak test")
+    parser.add_argument(
+        "--hours", type=float, default=24, help="Simulated hours to run for after warmup"
+    )
+    parser.add_argument(
+        "--clients", type=int, default=200, help="Connected clients to simulate"
+    )
+    parser.add_argument(
+        "--churn",
+        type=float,
+        default=0.02,
+        help="Fraction of clients replaced on every sweep",
+    )
+    parser.add_argument(
+        "--activity",
+        type=float,
+        default=0.05,
+        help="Chance for each client to become active on every sweep",
+    )
+    parser.add_argument(
+        "--max-idle-time",
+        type=int,
+        default=1800000,
+        help="Maximum idle time in milliseconds before a client is moved",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=60, help="Sweeps to run before the baseline"
+    )
+    parser.add_argument(
+        "--sample-every", type=int, default=30, help="Sweeps between samples"
+    )
+    parser.add_argument(
+        "--max-rss-growth-mb",
+        type=float,
+        default=16,
+        help="Allowed RSS growth after warmup",
+    )
+    parser.add_argument(
+        "--max-traced-growth-kb",
+        type=int,
+        default=512,
+        help="Allowed tracemalloc growth after warmup",
+    )
+    parser.add_argument(
+        "--max-latency-drift",
+        type=float,
+        default=1.5,
+        help="Allowed ratio between final and baseline p95 sweep latency",
+    )
+    parser.add_argument(
+        "--latency-slack-ms",
+        type=float,
+        default=2.0,
+        help="Absolute allowance on top of the latency drift",
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Top growing allocators to report"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for the simulated clients"
+    )
+
+    args = parser.parse_args()
+
+    if args.clients < 1:
+        parser.error("--clients must be at least 1")
+    if not 0 <= args.churn <= 1:
+        parser.error("--churn must be between 0 and 1")
+    if not 0 <= args.activity <= 1:
+        parser.error("--activity must be between 0 and 1")
+    if args.sample_every < 1:
+        parser.error("--sample-every must be at least 1")
+
+    logging.basicConfig(
+        level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    report = run_soak(
+        hours=args.hours,
+        clients=args.clients,
+        churn=args.churn,
+        activity=args.activity,
+        max_idle_time=args.max_idle_time,
+        warmup=args.warmup,
+        sample_every=args.sample_every,
+        budget=SoakBudget(
+            max_rss_growth_kb=int(args.max_rss_growth_mb * 1024),
+            max_traced_growth_kb=args.max_traced_growth_kb,
+            max_latency_drift=args.max_latency_drift,
+            latency_slack_ms=args.latency_slack_ms,
+        ),
+        top=args.top,
+        seed=args.seed,
+    )
+
+    print(
+        f"{'sweep':>7} {'hours':>7} {'rss KiB':>9} {'traced KiB':>10} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    if report.baseline:
+        rss_kb = "-" if report.baseline["rss_kb"] is None else report.baseline["rss_kb"]
+        print(
+            f"{report.baseline['sweep']:>7} {report.baseline['simulated_hours']:>7.1f} "
+            f"{rss_kb:>9} {report.baseline['traced_kb']:>10} "
+            f"{'-':>8} {'-':>8} {'-':>8} {'-':>8}"
+        )
+    for sample in report.samples:
+        rss_kb = "-" if sample["rss_kb"] is None else sample["rss_kb"]
+        print(
+            f"{sample['sweep']:>7} {sample['simulated_hours']:>7.1f} "
+            f"{rss_kb:>9} {sample['traced_kb']:>10} "
+            f"{sample['p50_ms']:>8.2f} {sample['p95_ms']:>8.2f} "
+            f"{sample['p99_ms']:>8.2f} {sample['max_ms']:>8.2f}"
+        )
+
+    if report.top_allocators:
+        print("\nTop growing allocators since warmup:")
+        for stat in report.top_allocators:
+            print(f"- {stat}")
+
+    if not report.passed:
+        print("\nSoak test failed:")
+        for failure in report.failures:
+            print(f"- {failure}")
+        sys.exit(1)
+
+    print("\nSoak test passed.")
+
+
+if __name__ == "__main__":
+    main()
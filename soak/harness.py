@@ -0,0 +1,455 @@
+"""
+This module drives the real TeamSpeakAFKBot loop against a simulated ServerQuery endpoint and
+checks that memory usage and per-sweep latency stay flat over hours of simulated operation.
+
+The bot's TS3API is replaced by SoakTS3API, whose sleep does not wait but records how long the
+preceding sweep took, samples memory and stops the bot once enough sweeps have run. The samples
+are then checked against a SoakBudget.
+"""
+
+import gc
+import logging
+import math
+import multiprocessing
+import os
+import statistics
+import time
+import tracemalloc
+
+from bot.core import TeamSpeakAFKBot
+from bot.ts3_api import TS3API
+
+from .server import serve
+
+SWEEP_INTERVAL = 60
+
+
+class SoakComplete(Exception):
+    """
+    Raised from SoakTS3API.sleep to break out of the bot's main loop once the soak is over.
+    """
+
+
+class SoakBudget:
+    """
+    The limits a soak run has to stay within.
+
+    Attributes:
+        max_rss_growth_kb (int): The allowed growth of the resident set size after warmup.
+            Only checked on platforms with /proc, such as Linux.
+        max_traced_growth_kb (int): The allowed growth of memory traced by tracemalloc after
+            warmup.
+        max_latency_drift (float): The allowed ratio between the p95 sweep latency at the end
+            of the run and right after warmup.
+        latency_slack_ms (float): An absolute allowance added on top of the latency drift, so
+            sub-millisecond jitter on fast sweeps does not fail the run.
+    """
+
+    def __init__(
+        self,
+        max_rss_growth_kb=16384,
+        max_traced_growth_kb=512,
+        max_latency_drift=1.5,
+        latency_slack_ms=2.0,
+    ):
+        self.max_rss_growth_kb = max_rss_growth_kb
+        self.max_traced_growth_kb = max_traced_growth_kb
+        self.max_latency_drift = max_latency_drift
+        self.latency_slack_ms = latency_slack_ms
+
+
+def get_rss_kb():
+    """
+    Return the current resident set size of this process in kilobytes.
+
+    The current size is only available from /proc, so this returns None on platforms without
+    it and the RSS check is skipped there.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except OSError:
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def traced_kb(snapshot):
+    """
+    Return the total size of the allocations in a tracemalloc snapshot in kilobytes.
+
+    :param snapshot: The tracemalloc.Snapshot to sum up.
+    """
+    return sum(stat.size for stat in snapshot.statistics("filename")) // 1024
+
+
+def percentile(values, fraction):
+    """
+    Return the nearest-rank percentile of a list of values.
+
+    :param values: The values to take the percentile of.
+    :param fraction: The percentile as a fraction between 0 and 1.
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class SoakMonitor:
+    """
+    Collects sweep latencies and periodic memory samples while the bot runs.
+
+    Attributes:
+        sweeps (int): The number of sweeps to run before stopping the bot.
+        warmup (int): The number of sweeps after which the baseline is taken.
+        sample_every (int): The number of sweeps between samples.
+        samples (list): The samples taken so far, as dictionaries.
+        simulated_seconds (int): The simulated seconds that passed since the end of warmup.
+        baseline (dict): The memory usage recorded at the end of warmup.
+        baseline_snapshot (tracemalloc.Snapshot): The snapshot taken at the end of warmup.
+        final_snapshot (tracemalloc.Snapshot): The snapshot taken at the end of the run.
+        max_client_id (int): The highest client ID seen in a client list, which shows whether
+            clients were replaced during the run.
+    """
+
+    def __init__(self, sweeps, warmup, sample_every):
+        self.sweeps = sweeps
+        self.warmup = warmup
+        self.sample_every = sample_every
+        self.samples = []
+        self.baseline = None
+        self.baseline_snapshot = None
+        self.final_snapshot = None
+        self.max_client_id = 0
+        self.completed = 0
+        self.simulated_seconds = 0
+        self.window = []
+        self.sweep_started = None
+
+    def start(self):
+        """
+        Mark the start of the first sweep.
+        """
+        self.sweep_started = time.perf_counter()
+
+    def end_sweep(self, duration):
+        """
+        Record the sweep that just finished and take a sample if one is due.
+
+        :param duration: The number of seconds the bot asked to sleep for.
+        :raises SoakComplete: When the configured number of sweeps has run.
+        """
+        self.window.append(time.perf_counter() - self.sweep_started)
+        self.completed += 1
+        if self.completed > self.warmup:
+            self.simulated_seconds += duration
+
+        if self.completed == self.warmup:
+            self.window = []
+            self.baseline_snapshot = self.take_snapshot()
+            self.baseline = {
+                "sweep": self.completed,
+                "simulated_hours": self.simulated_seconds / 3600,
+                "rss_kb": get_rss_kb(),
+                "traced_kb": traced_kb(self.baseline_snapshot),
+            }
+        elif self.completed > self.warmup and (
+            self.completed == self.sweeps
+            or (self.completed - self.warmup) % self.sample_every == 0
+        ):
+            self.take_sample()
+
+        if self.completed >= self.sweeps:
+            self.final_snapshot = self.take_snapshot()
+            raise SoakComplete()
+
+        self.sweep_started = time.perf_counter()
+
+    @staticmethod
+    def take_snapshot():
+        """
+        Take a tracemalloc snapshot of the bot's allocations, leaving out the harness itself.
+        """
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, os.path.join(os.path.dirname(__file__), "*")),
+            )
+        )
+
+    def take_sample(self):
+        """
+        Record memory usage and the latency percentiles of the sweeps since the last sample.
+        """
+        snapshot = self.take_snapshot()
+        latencies = [latency * 1000 for latency in self.window]
+        self.window = []
+
+        self.samples.append(
+            {
+                "sweep": self.completed,
+                "simulated_hours": self.simulated_seconds / 3600,
+                "rss_kb": get_rss_kb(),
+                "traced_kb": traced_kb(snapshot),
+                "p50_ms": percentile(latencies, 0.50),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+                "max_ms": max(latencies),
+            }
+        )
+
+    def top_allocators(self, limit=10):
+        """
+        Return the source lines whose allocations grew the most between warmup and the end of
+        the run.
+
+        :param limit: The number of source lines to return.
+        :return: A list of tracemalloc.StatisticDiff objects.
+        """
+        if self.baseline_snapshot is None or self.final_snapshot is None:
+            return []
+        return self.final_snapshot.compare_to(self.baseline_snapshot, "lineno")[:limit]
+
+
+class SoakTS3API(TS3API):
+    """
+    A TS3API whose sleep hands control to a SoakMonitor instead of waiting.
+    """
+
+    def __init__(self, server, query_port, username, password, monitor):
+        super().__init__(server, query_port, username, password)
+        self.monitor = monitor
+
+    def use(self, server_id):
+        super().use(server_id)
+        self.monitor.start()
+
+    def get_clients(self):
+        clients = super().get_clients()
+        for client in clients or []:
+            self.monitor.max_client_id = max(
+                self.monitor.max_client_id, int(client["clid"])
+            )
+        return clients
+
+    def sleep(self, duration):
+        self.monitor.end_sweep(duration)
+
+
+class ErrorCounter(logging.Handler):
+    """
+    Counts the errors the bot logs during the soak run.
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+        self.first = None
+
+    def emit(self, record):
+        self.count += 1
+        if self.first is None:
+            self.first = record.getMessage()
+
+
+def check_budget(baseline, samples, budget, errors=0):
+    """
+    Compare the samples of a soak run against a budget.
+
+    Memory growth is measured between the baseline taken at the end of warmup and the last
+    sample. Latency drift compares the median p95 of the first and last quarter of the
+    samples, so a single noisy window does not decide the result.
+
+    :param baseline: The memory usage recorded by a SoakMonitor at the end of warmup.
+    :param samples: The samples taken by a SoakMonitor.
+    :param budget: The SoakBudget to check against.
+    :param errors: The number of errors the bot logged.
+    :return: A list of human-readable failures, empty if the run stayed within budget.
+    """
+    failures = []
+
+    if errors:
+        failures.append(f"The bot logged {errors} error(s).")
+
+    if len(samples) < 2:
+        failures.append("Not enough samples were taken to check for growth or drift.")
+        return failures
+
+    last = samples[-1]
+
+    if baseline["rss_kb"] is not None and last["rss_kb"] is not None:
+        rss_growth = last["rss_kb"] - baseline["rss_kb"]
+        if rss_growth > budget.max_rss_growth_kb:
+            failures.append(
+                f"RSS grew by {rss_growth} KiB, budget is {budget.max_rss_growth_kb} KiB."
+            )
+
+    traced_growth = last["traced_kb"] - baseline["traced_kb"]
+    if traced_growth > budget.max_traced_growth_kb:
+        failures.append(
+            f"Traced memory grew by {traced_growth} KiB, "
+            f"budget is {budget.max_traced_growth_kb} KiB."
+        )
+
+    quarter = max(1, len(samples) // 4)
+    baseline_p95 = statistics.median(sample["p95_ms"] for sample in samples[:quarter])
+    final_p95 = statistics.median(sample["p95_ms"] for sample in samples[-quarter:])
+    allowed_p95 = baseline_p95 * budget.max_latency_drift + budget.latency_slack_ms
+    if final_p95 > allowed_p95:
+        failures.append(
+            f"p95 sweep latency drifted from {baseline_p95:.2f} ms to {final_p95:.2f} ms, "
+            f"budget is {allowed_p95:.2f} ms."
+        )
+
+    return failures
+
+
+class SoakReport:
+    """
+    The outcome of a soak run.
+
+    Attributes:
+        baseline (dict): The memory usage recorded at the end of warmup.
+        samples (list): The samples taken after warmup.
+        top_allocators (list): The tracemalloc.StatisticDiff objects of the largest growth.
+        errors (int): The number of errors the bot logged.
+        first_error (str): The first error message the bot logged, if any.
+        failures (list): The budget violations, empty if the run passed.
+        max_client_id (int): The highest client ID the bot saw.
+    """
+
+    def __init__(
+        self,
+        baseline,
+        samples,
+        top_allocators,
+        errors,
+        first_error,
+        failures,
+        max_client_id,
+    ):
+        self.baseline = baseline
+        self.samples = samples
+        self.top_allocators = top_allocators
+        self.errors = errors
+        self.first_error = first_error
+        self.failures = failures
+        self.max_client_id = max_client_id
+
+    @property
+    def passed(self):
+        """
+        bool: True if the run stayed within budget.
+        """
+        return not self.failures
+
+
+def run_soak(
+    hours=24,
+    clients=200,
+    churn=0.02,
+    activity=0.05,
+    max_idle_time=1800000,
+    warmup=60,
+    sample_every=30,
+    budget=None,
+    top=10,
+    seed=0,
+):
+    """
+    Run the bot against a simulated server for a number of simulated hours.
+
+    :param hours: The simulated hours to run for after warmup; every sweep covers one
+        minute.
+    :param clients: The number of voice clients kept connected to the simulated server.
+    :param churn: The fraction of clients replaced on every sweep.
+    :param activity: The chance for each client to become active on every sweep.
+    :param max_idle_time: The bot's maximum idle time in milliseconds.
+    :param warmup: The number of sweeps to run before taking the baseline.
+    :param sample_every: The number of sweeps between samples.
+    :param budget: The SoakBudget to check against, or None for the defaults.
+    :param top: The number of top allocators to report.
+    :param seed: The seed for the simulated client population.
+    :return: A SoakReport.
+    """
+    budget = budget or SoakBudget()
+    warmup = max(1, warmup)
+    sweeps = warmup + max(1, int(hours * 3600 / SWEEP_INTERVAL))
+    afk_channel_id = 2
+    channel_ids = [1, 3, 4, 5, 6, 7, 8]
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    endpoint = multiprocessing.Process(
+        target=serve,
+        args=(sender,),
+        kwargs={
+            "afk_channel_id": afk_channel_id,
+            "channel_ids": channel_ids,
+            "population": clients,
+            "churn": churn,
+            "activity": activity,
+            "sweep_interval": SWEEP_INTERVAL,
+            "seed": seed,
+        },
+        daemon=True,
+    )
+    endpoint.start()
+    sender.close()
+    port = receiver.recv()
+    receiver.close()
+
+    monitor = SoakMonitor(sweeps, warmup, sample_every)
+    error_counter = ErrorCounter()
+    logging.getLogger().addHandler(error_counter)
+
+    bot = TeamSpeakAFKBot(
+        server="127.0.0.1",
+        port=port,
+        username="serveradmin",
+        password="soak",
+        server_id=1,
+        afk_channel_id=afk_channel_id,
+        max_idle_time=max_idle_time,
+        channel_ids=[],
+        mode="blacklist",
+    )
+    bot.ts3_api = SoakTS3API("127.0.0.1", port, "serveradmin", "soak", monitor)
+
+    tracemalloc.start()
+    try:
+        bot.run()
+    except SoakComplete:
+        pass
+    finally:
+        tracemalloc.stop()
+        logging.getLogger().removeHandler(error_counter)
+        try:
+            bot.ts3_api.disconnect()
+        except Exception as e:
+            logging.warning("An error occurred while disconnecting: %s", e)
+        endpoint.terminate()
+        endpoint.join()
+
+    if monitor.completed < sweeps:
+        failures = [f"The bot stopped after {monitor.completed} of {sweeps} sweeps."]
+        if error_counter.first:
+            failures.append(f"First error: {error_counter.first}")
+        return SoakReport(
+            monitor.baseline,
+            monitor.samples,
+            [],
+            error_counter.count,
+            error_counter.first,
+            failures,
+            monitor.max_client_id,
+        )
+
+    return SoakReport(
+        monitor.baseline,
+        monitor.samples,
+        monitor.top_allocators(top),
+        error_counter.count,
+        error_counter.first,
+        check_budget(monitor.baseline, monitor.samples, budget, error_counter.count),
+        monitor.max_client_id,
+    )
@@ -0,0 +1,294 @@
+"""
+This module provides a simulated TeamSpeak 3 ServerQuery endpoint for soak testing.
+
+It defines the SimulatedServer class, which holds a churning population of clients on a
+simulated clock, and the SimulatedQueryHandler class, which speaks enough of the ServerQuery
+text protocol (login, use, clientlist, clientinfo, clientmove and quit) for the bot to run
+against it unmodified.
+
+Simulated time advances by a fixed interval on every clientlist request, so each sweep of the
+bot covers one polling interval of simulated operation regardless of how long it really took.
+"""
+
+import random
+import socketserver
+
+from ts3.escape import TS3Escape
+
+GREETING = (
+    b"TS3\n\r"
+    b"Welcome to the TeamSpeak 3 ServerQuery interface, type \"help\" for a list of "
+    b"commands and \"help <command>\" for information on a specific command.\n\r"
+)
+
+ERROR_OK = "error id=0 msg=ok"
+ERROR_INVALID_CLIENT = "error id=512 msg=invalid\\sclientID"
+ERROR_ALREADY_MEMBER = "error id=770 msg=already\\smember\\sof\\schannel"
+ERROR_UNKNOWN_COMMAND = "error id=256 msg=command\\snot\\sfound"
+
+QUERY_CLIENT_ID = 1
+
+
+class SimulatedServer:
+    """
+    A virtual server with a churning client population on a simulated clock.
+
+    Attributes:
+        afk_channel_id (int): The ID of the AFK channel.
+        channel_ids (list): The IDs of the regular channels clients join.
+        population (int): The number of voice clients kept connected.
+        churn (float): The fraction of clients replaced on every sweep.
+        activity (float): The chance for each client to become active on every sweep.
+        sweep_interval (int): The simulated seconds that pass on every clientlist request.
+        clock (int): The current simulated time in seconds.
+        clients (dict): The connected clients keyed by client ID.
+        churn_remainder (float): The fractional number of leaving clients carried over from
+            previous sweeps, so small populations still churn at the configured rate.
+    """
+
+    def __init__(
+        self,
+        afk_channel_id,
+        channel_ids,
+        population,
+        churn,
+        activity,
+        sweep_interval,
+        seed=0,
+    ):
+        self.afk_channel_id = afk_channel_id
+        self.channel_ids = channel_ids
+        self.population = population
+        self.churn = churn
+        self.activity = activity
+        self.sweep_interval = sweep_interval
+        self.random = random.Random(seed)
+        self.clock = 0
+        self.clients = {}
+        self.churn_remainder = 0.0
+        self.next_client_id = QUERY_CLIENT_ID + 1
+        self.next_database_id = 1
+
+        while len(self.clients) < self.population:
+            self.connect_client()
+
+    def connect_client(self):
+        """
+        Connect a new voice client with a fresh client ID to a random regular channel.
+        """
+        client_id = self.next_client_id
+        self.next_client_id += 1
+        self.next_database_id += 1
+
+        self.clients[client_id] = {
+            "cid": self.random.choice(self.channel_ids),
+            "client_database_id": self.next_database_id,
+            "client_nickname": f"Soak User {client_id} | {self.random.randrange(10**6)}",
+            "client_unique_identifier": f"soak{client_id:012d}/uid=",
+            "connected_at": self.clock,
+            "last_active": self.clock - self.random.randrange(3600),
+        }
+
+    def advance(self):
+        """
+        Advance the simulated clock by one sweep interval, replacing churned clients and
+        letting active clients leave the AFK channel.
+        """
+        self.clock += self.sweep_interval
+
+        self.churn_remainder += len(self.clients) * self.churn
+        leaving = int(self.churn_remainder)
+        self.churn_remainder -= leaving
+        for client_id in self.random.sample(sorted(self.clients), leaving):
+            del self.clients[client_id]
+
+        while len(self.clients) < self.population:
+            self.connect_client()
+
+        for client in self.clients.values():
+            if self.random.random() < self.activity:
+                client["last_active"] = self.clock
+                if client["cid"] == self.afk_channel_id:
+                    client["cid"] = self.random.choice(self.channel_ids)
+
+    def clientlist(self):
+        """
+        Advance the clock and return the connected clients, including the query client.
+
+        :return: A list of dictionaries as returned by the clientlist command.
+        """
+        self.advance()
+
+        entries = [
+            {
+                "clid": QUERY_CLIENT_ID,
+                "cid": self.channel_ids[0],
+                "client_database_id": 1,
+                "client_nickname": "serveradmin",
+                "client_type": 1,
+            }
+        ]
+        for client_id, client in self.clients.items():
+            entries.append(
+                {
+                    "clid": client_id,
+                    "cid": client["cid"],
+                    "client_database_id": client["client_database_id"],
+                    "client_nickname": client["client_nickname"],
+                    "client_type": 0,
+                }
+            )
+        return entries
+
+    def clientinfo(self, client_id):
+        """
+        Return the information for a single client.
+
+        :param client_id: The client ID to describe.
+        :return: A dictionary as returned by the clientinfo command, or None if the client is
+            not connected.
+        """
+        if client_id == QUERY_CLIENT_ID:
+            return {
+                "cid": self.channel_ids[0],
+                "client_idle_time": 0,
+                "client_nickname": "serveradmin",
+                "client_type": 1,
+            }
+
+        client = self.clients.get(client_id)
+        if client is None:
+            return None
+
+        return {
+            "cid": client["cid"],
+            "client_idle_time": (self.clock - client["last_active"]) * 1000,
+            "client_unique_identifier": client["client_unique_identifier"],
+            "client_nickname": client["client_nickname"],
+            "client_version": "3.6.2 [Build: 1695203293]",
+            "client_platform": "Linux",
+            "client_input_muted": 0,
+            "client_output_muted": 0,
+            "client_away": 0,
+            "client_away_message": "",
+            "client_type": 0,
+            "client_database_id": client["client_database_id"],
+            "client_servergroups": 8,
+            "client_created": 1700000000,
+            "client_lastconnected": 1700000000 + client["connected_at"],
+            "connection_connected_time": (self.clock - client["connected_at"]) * 1000,
+            "connection_client_ip": "127.0.0.1",
+        }
+
+    def clientmove(self, client_id, channel_id):
+        """
+        Move a client to a different channel.
+
+        :param client_id: The client ID to move.
+        :param channel_id: The channel ID to move the client to.
+        :return: The error line to answer the command with.
+        """
+        client = self.clients.get(client_id)
+        if client is None:
+            return ERROR_INVALID_CLIENT
+        if client["cid"] == channel_id:
+            return ERROR_ALREADY_MEMBER
+
+        client["cid"] = channel_id
+        return ERROR_OK
+
+
+def parse_command(line):
+    """
+    Split a ServerQuery command line into its name and unescaped parameters.
+
+    :param line: The decoded command line without its line ending.
+    :return: A tuple of the command name and a dictionary of parameters.
+    """
+    command, *tokens = line.split()
+    parameters = {}
+    for token in tokens:
+        key, _, value = token.partition("=")
+        parameters[key] = TS3Escape.unescape(value)
+    return command, parameters
+
+
+class SimulatedQueryHandler(socketserver.StreamRequestHandler):
+    """
+    Serves one ServerQuery connection against the SimulatedServer of the owning server.
+    """
+
+    def handle(self):
+        simulation = self.server.simulation
+        self.wfile.write(GREETING)
+
+        for raw_line in self.rfile:
+            line = raw_line.decode().strip()
+            if not line:
+                continue
+
+            command, parameters = parse_command(line)
+
+            if command == "quit":
+                self.reply(ERROR_OK)
+                return
+            elif command in ("login", "use"):
+                self.reply(ERROR_OK)
+            elif command == "clientlist":
+                self.reply(ERROR_OK, simulation.clientlist())
+            elif command == "clientinfo":
+                info = simulation.clientinfo(int(parameters["clid"]))
+                if info is None:
+                    self.reply(ERROR_INVALID_CLIENT)
+                else:
+                    self.reply(ERROR_OK, [info])
+            elif command == "clientmove":
+                self.reply(
+                    simulation.clientmove(
+                        int(parameters["clid"]), int(parameters["cid"])
+                    )
+                )
+            else:
+                self.reply(ERROR_UNKNOWN_COMMAND)
+
+    def reply(self, error, entries=None):
+        """
+        Write a response to the client.
+
+        :param error: The error line terminating the response.
+        :param entries: An optional list of dictionaries sent as the data line.
+        """
+        data = b""
+        if entries:
+            data = TS3Escape.escape_parameterlist(entries).encode() + b"\n\r"
+        self.wfile.write(data + error.encode() + b"\n\r")
+
+
+class SimulatedQueryServer(socketserver.ThreadingTCPServer):
+    """
+    A local TCP server exposing a SimulatedServer over the ServerQuery protocol.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, simulation):
+        super().__init__(address, SimulatedQueryHandler)
+        self.simulation = simulation
+
+
+def serve(connection, **simulation_options):
+    """
+    Run a SimulatedQueryServer on an ephemeral local port until the process is terminated.
+
+    This is the target of the separate process the soak harness starts, so the endpoint's own
+    allocations do not show up in the bot's memory measurements.
+
+    :param connection: A multiprocessing connection the bound port is sent over.
+    :param simulation_options: Keyword arguments for the SimulatedServer.
+    """
+    simulation = SimulatedServer(**simulation_options)
+    with SimulatedQueryServer(("127.0.0.1", 0), simulation) as server:
+        connection.send(server.server_address[1])
+        connection.close()
+        server.serve_forever()
@@ -0,0 +1,143 @@
+# pylint: disable=missing-module-docstring,missing-class-docstring,missing-function-docstring
+import unittest
+
+from soak import SoakBudget, check_budget, run_soak
+from soak.harness import percentile
+from soak.server import SimulatedServer
+
+
+BASELINE = {"rss_kb": 20000, "traced_kb": 200}
+
+
+def make_sample(rss_kb=20000, traced_kb=200, p95_ms=10.0):
+    return {"rss_kb": rss_kb, "traced_kb": traced_kb, "p95_ms": p95_ms}
+
+
+class TestSimulatedServer(unittest.TestCase):
+    def setUp(self):
+        self.server = SimulatedServer(
+            afk_channel_id=2,
+            channel_ids=[1, 3],
+            population=10,
+            churn=0.2,
+            activity=0.0,
+            sweep_interval=60,
+        )
+
+    def test_clientlist_advances_clock_and_churns(self):
+        first = {entry["clid"] for entry in self.server.clientlist()}
+        second = {entry["clid"] for entry in self.server.clientlist()}
+
+        self.assertEqual(self.server.clock, 120)
+        self.assertEqual(len(second), 11)
+        self.assertEqual(len(first - second), 2)
+
+    def test_small_population_churns(self):
+        server = SimulatedServer(
+            afk_channel_id=2,
+            channel_ids=[1, 3],
+            population=10,
+            churn=0.02,
+            activity=0.0,
+            sweep_interval=60,
+        )
+        initial = set(server.clients)
+
+        for _ in range(4):
+            server.clientlist()
+        self.assertEqual(set(server.clients), initial)
+
+        server.clientlist()
+        self.assertEqual(len(initial - set(server.clients)), 1)
+
+    def test_clientinfo_idle_time(self):
+        client_id = next(iter(self.server.clients))
+        self.server.clients[client_id]["last_active"] = 0
+        self.server.clientlist()
+
+        info = self.server.clientinfo(client_id)
+
+        self.assertEqual(info["client_idle_time"], 60000)
+        self.assertIsNone(self.server.clientinfo(-1))
+
+    def test_clientmove(self):
+        client_id = next(iter(self.server.clients))
+
+        self.assertEqual(self.server.clientmove(client_id, 2), "error id=0 msg=ok")
+        self.assertEqual(self.server.clients[client_id]["cid"], 2)
+        self.assertIn("id=770", self.server.clientmove(client_id, 2))
+
+
+class TestPercentile(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 31))
+
+        self.assertEqual(percentile(values, 0.95), 29)
+        self.assertEqual(percentile(list(range(1, 11)), 0.25), 3)
+        self.assertEqual(percentile(values, 0.50), 15)
+        self.assertEqual(percentile(values, 1.0), 30)
+        self.assertEqual(percentile([7], 0.99), 7)
+
+
+class TestCheckBudget(unittest.TestCase):
+    def test_within_budget(self):
+        samples = [make_sample(), make_sample(rss_kb=20100, traced_kb=210)]
+
+        self.assertEqual(check_budget(BASELINE, samples, SoakBudget()), [])
+
+    def test_memory_growth(self):
+        samples = [make_sample(), make_sample(rss_kb=60000, traced_kb=2000)]
+
+        failures = check_budget(BASELINE, samples, SoakBudget())
+
+        self.assertEqual(len(failures), 2)
+
+    def test_growth_measured_from_baseline(self):
+        samples = [make_sample(traced_kb=900), make_sample(traced_kb=900)]
+
+        failures = check_budget(BASELINE, samples, SoakBudget())
+
+        self.assertEqual(len(failures), 1)
+        self.assertIn("Traced memory", failures[0])
+
+    def test_rss_unavailable(self):
+        samples = [make_sample(rss_kb=None), make_sample(rss_kb=None)]
+
+        self.assertEqual(check_budget(BASELINE, samples, SoakBudget()), [])
+
+    def test_latency_drift(self):
+        samples = [make_sample(p95_ms=10.0)] * 4 + [make_sample(p95_ms=30.0)] * 4
+
+        failures = check_budget(BASELINE, samples, SoakBudget())
+
+        self.assertEqual(len(failures), 1)
+        self.assertIn("latency", failures[0])
+
+    def test_errors_and_missing_samples(self):
+        failures = check_budget(BASELINE, [make_sample()], SoakBudget(), errors=3)
+
+        self.assertEqual(len(failures), 2)
+
+
+class TestRunSoak(unittest.TestCase):
+    def test_short_run(self):
+        report = run_soak(
+            hours=0.5,
+            clients=20,
+            warmup=5,
+            sample_every=10,
+            budget=SoakBudget(max_latency_drift=10, latency_slack_ms=100),
+        )
+
+        self.assertEqual(report.failures, [])
+        self.assertEqual([sample["sweep"] for sample in report.samples], [15, 25, 35])
+        self.assertEqual(report.baseline["sweep"], 5)
+        self.assertEqual(report.baseline["simulated_hours"], 0)
+        self.assertEqual(report.samples[-1]["simulated_hours"], 0.5)
+        self.assertEqual(report.errors, 0)
+        # The initial population uses client IDs 2 to 21, so anything higher joined later.
+        self.assertGreater(report.max_client_id, 21)
+
+
+if __name__ == "__main__":
+    unittest.main()